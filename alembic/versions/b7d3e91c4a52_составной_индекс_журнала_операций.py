@@ -0,0 +1,34 @@
+"""Составной индекс журнала операций.
+
+Ревизия: b7d3e91c4a52
+Создана: 2026-08-26 12:04:18.511204
+Сообщение: составной индекс (client_id, created_at) для operations
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Идентификаторы ревизии (используются Alembic)
+revision: str = 'b7d3e91c4a52'
+down_revision: Union[str, None] = 'ac0841f5b1fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Применить миграцию (вперёд)."""
+    op.create_index(
+        'ix_operations_client_id_created_at',
+        'operations',
+        ['client_id', 'created_at'],
+        unique=False,
+    )
+    # Одиночный индекс по client_id вытесняется составным
+    op.drop_index(op.f('ix_operations_client_id'), table_name='operations')
+
+
+def downgrade() -> None:
+    """Откатить миграцию (назад)."""
+    op.create_index(op.f('ix_operations_client_id'), 'operations', ['client_id'], unique=False)
+    op.drop_index('ix_operations_client_id_created_at', table_name='operations')
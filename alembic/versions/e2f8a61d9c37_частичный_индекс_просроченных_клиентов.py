@@ -0,0 +1,35 @@
+"""Частичный индекс просроченных активных клиентов.
+
+Ревизия: e2f8a61d9c37
+Создана: 2026-08-26 14:37:52.284916
+Сообщение: частичный индекс (expires_at) WHERE status = 'ACTIVE' для clients
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# Идентификаторы ревизии (используются Alembic)
+revision: str = 'e2f8a61d9c37'
+down_revision: Union[str, None] = 'b7d3e91c4a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Применить миграцию (вперёд)."""
+    # Expiry-свип фильтрует status = 'ACTIVE' AND expires_at < now():
+    # частичный индекс растёт с числом активных клиентов, а не всех.
+    op.create_index(
+        'clients_expired_active_idx',
+        'clients',
+        ['expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+
+
+def downgrade() -> None:
+    """Откатить миграцию (назад)."""
+    op.drop_index('clients_expired_active_idx', table_name='clients')
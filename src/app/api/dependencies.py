@@ -4,45 +4,51 @@
 создаются и предоставляются через функции-провайдеры.
 """
 
-from functools import lru_cache
-
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import Settings, get_settings
-from app.database.session import get_audit_session, get_session
+from app.config import get_settings
+from app.database.session import get_session, get_session_factory
+from app.repositories.operation import OperationRepository
 from app.services.client import ClientService
 from app.services.remnawave import RemnawaveService
 
 
-@lru_cache(maxsize=1)
-def _create_remnawave_service() -> RemnawaveService:
-    """Внутренний фабричный метод — синглтон RemnaWave-сервиса."""
-    settings = get_settings()
-    return RemnawaveService(settings)
+def get_remnawave_service(request: Request) -> RemnawaveService:
+    """Провайдер сервиса RemnaWave.
 
+    Возвращает синглтон, созданный в `lifespan` приложения, —
+    один экземпляр SDK-клиента на весь жизненный цикл процесса.
+    """
+    return request.app.state.remnawave
 
-def get_remnawave_service() -> RemnawaveService:
-    """Провайдер сервиса RemnaWave.
 
-    Переиспользует один экземпляр SDK-клиента
-    на весь жизненный цикл приложения.
+def get_operation_repository(
+    session: AsyncSession = Depends(get_session),
+) -> OperationRepository:
+    """Провайдер репозитория журнала операций.
+
+    Args:
+        session: Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        Экземпляр OperationRepository.
     """
-    return _create_remnawave_service()
+    return OperationRepository(session)
 
 
 def get_client_service(
     session: AsyncSession = Depends(get_session),
-    audit_session: AsyncSession = Depends(get_audit_session),
     remnawave: RemnawaveService = Depends(get_remnawave_service),
 ) -> ClientService:
     """Провайдер сервиса бизнес-логики клиентов.
 
     Создаётся на каждый запрос (т.к. привязан к сессии БД).
+    Сессия для аудита ошибок открывается из фабрики только на пути
+    сбоя, поэтому успешные запросы не резервируют второе подключение.
 
     Args:
         session: Асинхронная сессия SQLAlchemy.
-        audit_session: Независимая сессия для аудит-логов ошибок.
         remnawave: Сервис RemnaWave.
 
     Returns:
@@ -50,6 +56,7 @@ def get_client_service(
     """
     return ClientService(
         session=session,
-        audit_session=audit_session,
         remnawave=remnawave,
+        audit_session_factory=get_session_factory(),
+        deactivate_concurrency=get_settings().deactivate_concurrency,
     )
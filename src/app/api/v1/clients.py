@@ -3,16 +3,16 @@
 import uuid
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 
 from app.api.dependencies import get_client_service
-from app.models.client import ClientStatus
+from app.models.client import Client, ClientStatus
 from app.schemas.client import (
+    CLIENT_LIST_ADAPTER,
     ClientCreateRequest,
     ClientCreateResponse,
     ClientExtendRequest,
-    ClientListResponse,
     ClientResponse,
-    ConfigResponse,
     MessageResponse,
 )
 from app.services.client import ClientService
@@ -46,7 +46,6 @@ async def create_client(
 
 @router.get(
     "",
-    response_model=ClientListResponse,
     summary="Список клиентов",
 )
 async def list_clients(
@@ -58,14 +57,29 @@ async def list_clients(
         default=None,
         description="Фильтр по истечению подписки: true = просроченные",
     ),
+    limit: int = Query(
+        default=50,
+        ge=1,
+        le=500,
+        description="Максимальный размер страницы",
+    ),
+    offset: int = Query(
+        default=0,
+        ge=0,
+        description="Смещение от начала списка",
+    ),
     service: ClientService = Depends(get_client_service),
-) -> ClientListResponse:
-    """Получить список клиентов с фильтрацией."""
-    clients, total = await service.get_clients(status=status, expired=expired)
-    return ClientListResponse(
-        items=[ClientResponse.model_validate(c) for c in clients],
-        total=total,
+) -> ORJSONResponse:
+    """Получить страницу списка клиентов с фильтрацией."""
+    clients, total = await service.get_clients(
+        status=status,
+        expired=expired,
+        limit=limit,
+        offset=offset,
     )
+    validated = CLIENT_LIST_ADAPTER.validate_python(clients, from_attributes=True)
+    items = CLIENT_LIST_ADAPTER.dump_python(validated, mode="json")
+    return ORJSONResponse({"items": items, "total": total})
 
 
 @router.get(
@@ -76,10 +90,9 @@ async def list_clients(
 async def get_client(
     client_id: uuid.UUID,
     service: ClientService = Depends(get_client_service),
-) -> ClientResponse:
+) -> Client:
     """Получить подробную информацию о клиенте."""
-    client = await service.get_client(client_id)
-    return ClientResponse.model_validate(client)
+    return await service.get_client(client_id)
 
 
 @router.delete(
@@ -112,17 +125,16 @@ async def extend_subscription(
     client_id: uuid.UUID,
     body: ClientExtendRequest,
     service: ClientService = Depends(get_client_service),
-) -> ClientResponse:
+) -> Client:
     """Продлить подписку клиента на N дней.
 
     Если подписка истекла — отсчёт от текущего момента.
     Если ещё активна — дни прибавляются к текущей дате истечения.
     """
-    client = await service.extend_subscription(
+    return await service.extend_subscription(
         client_id=client_id,
         days=body.days,
     )
-    return ClientResponse.model_validate(client)
 
 
 # ── Доступ ───────────────────────────────────────────────
@@ -136,10 +148,9 @@ async def extend_subscription(
 async def block_client(
     client_id: uuid.UUID,
     service: ClientService = Depends(get_client_service),
-) -> ClientResponse:
+) -> Client:
     """Заблокировать клиента — отключить VPN-доступ в RemnaWave."""
-    client = await service.block_client(client_id)
-    return ClientResponse.model_validate(client)
+    return await service.block_client(client_id)
 
 
 @router.post(
@@ -150,10 +161,9 @@ async def block_client(
 async def unblock_client(
     client_id: uuid.UUID,
     service: ClientService = Depends(get_client_service),
-) -> ClientResponse:
+) -> Client:
     """Разблокировать клиента — включить VPN-доступ в RemnaWave."""
-    client = await service.unblock_client(client_id)
-    return ClientResponse.model_validate(client)
+    return await service.unblock_client(client_id)
 
 
 # ── Конфигурация ─────────────────────────────────────────
@@ -161,19 +171,20 @@ async def unblock_client(
 
 @router.get(
     "/{client_id}/config",
-    response_model=ConfigResponse,
     summary="Получить конфигурацию",
 )
 async def get_config(
     client_id: uuid.UUID,
     service: ClientService = Depends(get_client_service),
-) -> ConfigResponse:
+) -> ORJSONResponse:
     """Получить данные подключения / конфигурацию клиента.
 
     Формат: base64-строка конфигурации подписки из RemnaWave.
     """
-    data = await service.get_config(client_id)
-    return ConfigResponse(**data)
+    # Сервис отдаёт готовый ConfigResponse — сериализуем напрямую,
+    # без повторной валидации через response_model.
+    config = await service.get_config(client_id)
+    return ORJSONResponse(config.model_dump())
 
 
 @router.post(
@@ -184,11 +195,10 @@ async def get_config(
 async def rotate_config(
     client_id: uuid.UUID,
     service: ClientService = Depends(get_client_service),
-) -> ClientResponse:
+) -> Client:
     """Перевыпустить конфигурацию / ключ подписки.
 
     Генерирует новый short_uuid в RemnaWave.
     Старая конфигурация перестаёт работать.
     """
-    client = await service.rotate_config(client_id)
-    return ClientResponse.model_validate(client)
+    return await service.rotate_config(client_id)
@@ -1,21 +1,20 @@
 """Роутеры API v1 — эндпоинты журнала операций (аудит)."""
 
 import uuid
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 
-from app.api.dependencies import get_client_service
+from app.api.dependencies import get_operation_repository
 from app.repositories.operation import OperationRepository
-from app.database.session import get_session
-from app.schemas.operation import OperationListResponse, OperationResponse
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.operation import OPERATION_LIST_ADAPTER
 
 router = APIRouter(prefix="/operations", tags=["аудит"])
 
 
 @router.get(
     "",
-    response_model=OperationListResponse,
     summary="Журнал операций",
 )
 async def list_operations(
@@ -23,16 +22,56 @@ async def list_operations(
         ...,
         description="UUID клиента для фильтрации операций",
     ),
-    session: AsyncSession = Depends(get_session),
-) -> OperationListResponse:
+    limit: int = Query(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Максимальный размер страницы",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description=(
+            "Курсор следующей страницы из предыдущего ответа "
+            "(формат: '<created_at>,<id>')"
+        ),
+    ),
+    repo: OperationRepository = Depends(get_operation_repository),
+) -> ORJSONResponse:
     """Получить журнал операций по клиенту.
 
-    Возвращает все операции (аудит-лог) для указанного клиента,
-    отсортированные по дате создания (новые — первыми).
+    Возвращает страницу операций (аудит-лог) для указанного клиента,
+    отсортированную по дате создания (новые — первыми). Пагинация
+    keyset-курсором `(created_at, id)`: глубокие страницы не сканируют
+    пропущенные строки, как это делает OFFSET.
     """
-    repo = OperationRepository(session)
-    operations, total = await repo.get_by_client_id(client_id)
-    return OperationListResponse(
-        items=[OperationResponse.model_validate(op) for op in operations],
-        total=total,
+    after = None
+    if cursor is not None:
+        try:
+            raw_ts, raw_id = cursor.split(",", 1)
+            after = (datetime.fromisoformat(raw_ts), uuid.UUID(raw_id))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Некорректный курсор пагинации",
+            )
+
+    operations, next_cursor = await repo.get_by_client_id(
+        client_id,
+        after=after,
+        limit=limit,
+    )
+    validated = OPERATION_LIST_ADAPTER.validate_python(
+        operations,
+        from_attributes=True,
+    )
+    items = OPERATION_LIST_ADAPTER.dump_python(validated, mode="json")
+    return ORJSONResponse(
+        {
+            "items": items,
+            "next_cursor": (
+                f"{next_cursor[0].isoformat()},{next_cursor[1]}"
+                if next_cursor is not None
+                else None
+            ),
+        }
     )
@@ -1,5 +1,7 @@
 """Конфигурация приложения — загрузка из переменных окружения."""
 
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,15 +23,35 @@ class Settings(BaseSettings):
     app_host: str = "0.0.0.0"
     app_port: int = 8000
     app_debug: bool = False
+    # Количество воркеров Uvicorn (подставляется в CMD контейнера).
+    # Сервис полностью I/O-bound, поэтому запускается под uvloop +
+    # httptools (входят в uvicorn[standard]); ориентир — по воркеру
+    # на ядро CPU.
+    app_workers: int = 1
 
     # ── База данных (наш PostgreSQL оркестратора) ────────
     database_url: str
+    # Размер пула подбирается под ожидаемую конкурентность:
+    # ориентир — pool_size + max_overflow ≈ число одновременных запросов.
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
 
     # ── Интеграция с RemnaWave ───────────────────────────
     remnawave_base_url: str
     remnawave_api_token: str
+    # Глобальный лимит одновременных запросов к панели RemnaWave
+    remnawave_concurrency: int = 32
+    # Максимум одновременных вызовов RemnaWave в expiry-свипе
+    deactivate_concurrency: int = 16
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Создать и вернуть экземпляр настроек."""
+    """Вернуть единственный экземпляр настроек (кэшируется на процесс).
+
+    `.env` читается и валидируется один раз; в тестах кэш сбрасывается
+    через `get_settings.cache_clear()`.
+    """
     return Settings()  # type: ignore[call-arg]
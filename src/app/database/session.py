@@ -1,6 +1,11 @@
 """Асинхронный движок SQLAlchemy и фабрика сессий."""
 
+from functools import lru_cache
+
+import orjson
+from sqlalchemy import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -8,19 +13,53 @@ from sqlalchemy.ext.asyncio import (
 
 from app.config import get_settings
 
-settings = get_settings()
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.app_debug,
-    pool_pre_ping=True,
-)
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    """Создать (один раз на процесс) асинхронный движок SQLAlchemy.
 
-async_session_factory = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+    Ленивая инициализация: настройки читаются при первом обращении,
+    а не при импорте модуля, поэтому импорт не требует готового `.env`
+    (важно для тестов и инструментов).
+    """
+    settings = get_settings()
+
+    # Принудительно используем asyncpg: нативный asyncio-протокол вместо
+    # эмуляции async через пул потоков у синхронных драйверов.
+    database_url = settings.database_url
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace(
+            "postgresql://", "postgresql+asyncpg://", 1
+        )
+
+    return create_async_engine(
+        database_url,
+        echo=settings.app_debug,
+        # JIT PostgreSQL только мешает коротким OLTP-запросам оркестратора.
+        connect_args={"server_settings": {"jit": "off"}},
+        # JSON-колонки (payload аудита) сериализуются orjson'ом:
+        # быстрее stdlib json и понимает datetime/UUID без isoformat().
+        json_serializer=lambda value: orjson.dumps(
+            value, option=orjson.OPT_NAIVE_UTC
+        ).decode(),
+        json_deserializer=orjson.loads,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Вернуть фабрику асинхронных сессий (кэшируется на процесс)."""
+    return async_sessionmaker(
+        bind=get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
 
 
 async def get_session() -> AsyncSession:  # type: ignore[misc]
@@ -28,26 +67,10 @@ async def get_session() -> AsyncSession:  # type: ignore[misc]
 
     Используется как зависимость FastAPI:
         session: AsyncSession = Depends(get_session)
-    """
-    async with async_session_factory() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-
-
-async def get_audit_session() -> AsyncSession:  # type: ignore[misc]
-    """Независимая сессия для записи аудит-логов ошибок.
 
-    Коммитится отдельно от основной транзакции, поэтому
-    FAIL-записи сохраняются даже при rollback основной сессии.
+    `session.begin()` коммитит при нормальном выходе и откатывает при
+    исключении — без ручного try/except и лишнего BEGIN от autobegin.
     """
-    async with async_session_factory() as session:
-        try:
+    async with get_session_factory()() as session:
+        async with session.begin():
             yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
@@ -1,6 +1,40 @@
 """Пользовательские исключения и глобальные обработчики ошибок."""
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+
+# ── Обработчики ──────────────────────────────────────────
+
+
+async def http_exception_handler(
+    request: Request,
+    exc: StarletteHTTPException,
+) -> ORJSONResponse:
+    """Обработчик HTTP-исключений → единый JSON-формат."""
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+    )
+
+
+async def validation_exception_handler(
+    request: Request,
+    exc: RequestValidationError,
+) -> ORJSONResponse:
+    """Обработчик ошибок валидации → понятный JSON."""
+    return ORJSONResponse(
+        status_code=422,
+        content={
+            "detail": "Ошибка валидации входных данных",
+            "errors": exc.errors(),
+        },
+    )
+
+
+# ── Исключения ───────────────────────────────────────────
 
 
 class ClientNotFoundError(HTTPException):
@@ -61,3 +95,12 @@ class RemnawaveIntegrationError(HTTPException):
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail="Ошибка взаимодействия с VPN-провайдером",
         )
+
+
+# ── Преднастроенные экземпляры ───────────────────────────
+# У этих ошибок сообщение константно, поэтому экземпляры создаются
+# один раз на процесс; FastAPI не мутирует HTTPException при обработке,
+# так что повторное использование безопасно.
+CLIENT_ALREADY_BLOCKED = ClientAlreadyBlockedError()
+CLIENT_NOT_BLOCKED = ClientNotBlockedError()
+CLIENT_CONFIG_UNAVAILABLE = ClientConfigUnavailableError()
@@ -4,13 +4,20 @@ import logging
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import ORJSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.v1.router import router as v1_router
 from app.config import get_settings
+from app.exceptions.handlers import (
+    http_exception_handler,
+    validation_exception_handler,
+)
+from app.middleware import ErrorHandlingMiddleware, ProfilingMiddleware
+from app.services.remnawave import RemnawaveService, build_sdk
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +28,17 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # ── Запуск ───────────────────────────────────────────
     settings = get_settings()
     app.state.settings = settings
+    # Один SDK (и его httpx-пул) на процесс — warm TCP/TLS-соединения
+    # к панели переиспользуются всеми запросами.
+    app.state.remnawave_sdk = build_sdk(settings)
+    app.state.remnawave = RemnawaveService(
+        app.state.remnawave_sdk,
+        concurrency=settings.remnawave_concurrency,
+    )
     logger.info("Оркестратор запущен на %s:%s", settings.app_host, settings.app_port)
     yield
     # ── Остановка ────────────────────────────────────────
+    await app.state.remnawave.aclose()
     logger.info("Оркестратор остановлен")
 
 
@@ -40,44 +55,25 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    # ── Глобальная обработка ошибок ──────────────────────
+    # ── Middleware ───────────────────────────────────────
+    # Порядок важен: add_middleware оборачивает стек снаружи, поэтому
+    # регистрация идёт изнутри наружу — gzip ближе к роутерам,
+    # обработчик ошибок остаётся самым внешним слоем.
+
+    # Профилировщик доступен только в debug-режиме: ?profile=1
+    if settings.app_debug:
+        app.add_middleware(ProfilingMiddleware)
 
-    @app.exception_handler(StarletteHTTPException)
-    async def http_exception_handler(
-        request: Request,
-        exc: StarletteHTTPException,
-    ) -> ORJSONResponse:
-        """Обработчик HTTP-исключений → единый JSON-формат."""
-        return ORJSONResponse(
-            status_code=exc.status_code,
-            content={"detail": exc.detail},
-        )
-
-    @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(
-        request: Request,
-        exc: RequestValidationError,
-    ) -> ORJSONResponse:
-        """Обработчик ошибок валидации → понятный JSON."""
-        return ORJSONResponse(
-            status_code=422,
-            content={
-                "detail": "Ошибка валидации входных данных",
-                "errors": exc.errors(),
-            },
-        )
-
-    @app.exception_handler(Exception)
-    async def generic_exception_handler(
-        request: Request,
-        exc: Exception,
-    ) -> ORJSONResponse:
-        """Обработчик непредвиденных ошибок → 500 без утечки деталей."""
-        logger.exception("Непредвиденная ошибка: %s", exc)
-        return ORJSONResponse(
-            status_code=500,
-            content={"detail": "Внутренняя ошибка сервера"},
-        )
+    # Сжатие больших JSON-ответов (списки клиентов / журнал операций)
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+    # Catch-all для непредвиденных ошибок — чистый ASGI,
+    # без накладных расходов BaseHTTPMiddleware на успешном пути.
+    app.add_middleware(ErrorHandlingMiddleware)
+
+    # ── Глобальная обработка ошибок ──────────────────────
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
     # ── Роутеры ──────────────────────────────────────────
     app.include_router(v1_router)
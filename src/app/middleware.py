@@ -0,0 +1,112 @@
+"""Чистые ASGI-middleware приложения.
+
+Middleware здесь реализованы напрямую через протокол ASGI, а не через
+`BaseHTTPMiddleware` Starlette: обёртка на BaseHTTPMiddleware добавляет
+заметные накладные расходы на каждый запрос.
+"""
+
+import logging
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorHandlingMiddleware:
+    """Глобальный перехват непредвиденных ошибок → 500 без утечки деталей.
+
+    HTTPException и RequestValidationError обрабатываются штатными
+    обработчиками Starlette внутри роутера и сюда не доходят; этот
+    middleware страхует только от необработанных исключений, не
+    добавляя Python-фрейма поверх BaseHTTPMiddleware на успешном пути.
+
+    Attributes:
+        app: Следующее ASGI-приложение в цепочке.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def _send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        except Exception as exc:
+            logger.exception("Непредвиденная ошибка: %s", exc)
+            if response_started:
+                # Ответ уже начат — корректный 500 отправить нельзя.
+                raise
+            body = orjson.dumps({"detail": "Внутренняя ошибка сервера"})
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 500,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode("ascii")),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса через pyinstrument.
+
+    Активируется query-параметром `?profile=1` и подключается только
+    в debug-режиме (см. `create_app`). Вместо обычного ответа эндпоинта
+    возвращает HTML-отчёт профилировщика.
+
+    Attributes:
+        app: Следующее ASGI-приложение в цепочке.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or b"profile=1" not in scope.get(
+            "query_string", b""
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Ленивый импорт: pyinstrument — dev-зависимость,
+        # в production-окружении middleware не подключается.
+        from pyinstrument import Profiler
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+
+        async def _discard(message: Message) -> None:
+            """Поглотить оригинальный ответ — вернём отчёт вместо него."""
+
+        try:
+            await self.app(scope, receive, _discard)
+        finally:
+            profiler.stop()
+
+        body = profiler.output_html().encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/html; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
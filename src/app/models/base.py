@@ -1,5 +1,8 @@
 """Декларативная база для всех ORM-моделей."""
 
+import uuid
+
+import uuid_utils
 from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass
 
 
@@ -11,3 +14,13 @@ class Base(DeclarativeBase):
     """
 
     pass
+
+
+def uuid7() -> uuid.UUID:
+    """Сгенерировать время-упорядоченный UUIDv7 (stdlib-совместимый).
+
+    Последовательные по времени первичные ключи не фрагментируют B-tree
+    при вставке, в отличие от случайных UUIDv4, и коррелируют с
+    `created_at` при range-сканах.
+    """
+    return uuid.UUID(int=uuid_utils.uuid7().int)
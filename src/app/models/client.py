@@ -4,11 +4,11 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, String, func
+from sqlalchemy import DateTime, Enum, Index, String, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base
+from app.models.base import Base, uuid7
 
 
 class ClientStatus(str, enum.Enum):
@@ -37,11 +37,20 @@ class Client(Base):
     """
 
     __tablename__ = "clients"
+    __table_args__ = (
+        # Частичный индекс под expiry-свип: только активные клиенты,
+        # отсортированные по дате истечения (см. claim_expired_active).
+        Index(
+            "clients_expired_active_idx",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
     username: Mapped[str] = mapped_column(
         String(255),
@@ -89,10 +98,13 @@ class Client(Base):
     )
 
     # ── Связь с аудит-логом ──────────────────────────────
+    # lazy="raise": ни один эндпоинт не обходит client.operations,
+    # аудит читается напрямую через OperationRepository. Явная загрузка
+    # (selectinload) подключается точечно там, где связь правда нужна.
     operations: Mapped[list["Operation"]] = relationship(
         back_populates="client",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
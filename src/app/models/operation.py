@@ -4,11 +4,11 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, Text, func
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base
+from app.models.base import Base, uuid7
 
 
 class ActionType(str, enum.Enum):
@@ -48,17 +48,28 @@ class Operation(Base):
     """
 
     __tablename__ = "operations"
+    __table_args__ = (
+        # Составной индекс под выборку журнала: фильтр по client_id
+        # с сортировкой по created_at DESC (страницы журнала).
+        Index(
+            "ix_operations_client_id_created_at",
+            "client_id",
+            "created_at",
+        ),
+    )
+    # Серверные значения по умолчанию (created_at) возвращаются тем же
+    # INSERT'ом через RETURNING — без догружающего SELECT после flush.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
     client_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("clients.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
         comment="Ссылка на клиента",
     )
     action: Mapped[ActionType] = mapped_column(
@@ -3,10 +3,14 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import select, func
+from sqlalchemy import Row, bindparam, select, func, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.models.base import uuid7
 from app.models.client import Client, ClientStatus
+from app.models.operation import ActionType, OperationResult
 
 
 class ClientRepository:
@@ -36,6 +40,35 @@ class ClientRepository:
         await self._session.refresh(client)
         return client
 
+    async def insert_if_absent(self, client: Client) -> Client | None:
+        """Вставить клиента, если username ещё не занят (один запрос).
+
+        `INSERT ... ON CONFLICT (username) DO NOTHING RETURNING *`
+        заменяет пару SELECT-проверка + INSERT: нет лишнего round-trip'а
+        и TOCTOU-гонки между проверкой и вставкой.
+
+        Args:
+            client: Экземпляр модели Client для сохранения.
+
+        Returns:
+            Сохранённый клиент или None, если username уже занят.
+        """
+        stmt = (
+            pg_insert(Client)
+            .values(
+                username=client.username,
+                remnawave_uuid=client.remnawave_uuid,
+                short_uuid=client.short_uuid,
+                subscription_url=client.subscription_url,
+                status=client.status,
+                expires_at=client.expires_at,
+            )
+            .on_conflict_do_nothing(index_elements=["username"])
+            .returning(Client)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def get_by_id(self, client_id: uuid.UUID) -> Client | None:
         """Получить клиента по UUID.
 
@@ -64,53 +97,142 @@ class ClientRepository:
         self,
         status: ClientStatus | None = None,
         expired: bool | None = None,
+        limit: int = 50,
+        offset: int = 0,
     ) -> tuple[list[Client], int]:
-        """Получить список клиентов с фильтрацией.
+        """Получить страницу списка клиентов с фильтрацией.
 
         Args:
             status: Фильтр по статусу (active / blocked).
             expired: Фильтр по истечению подписки (True = просроченные).
+            limit: Максимальный размер страницы.
+            offset: Смещение от начала списка.
 
         Returns:
-            Кортеж (список клиентов, общее количество).
+            Кортеж (страница клиентов, общее количество).
         """
-        stmt = select(Client)
-        count_stmt = select(func.count(Client.id))
-
+        conditions = []
         if status is not None:
-            stmt = stmt.where(Client.status == status)
-            count_stmt = count_stmt.where(Client.status == status)
+            conditions.append(Client.status == status)
 
         if expired is True:
-            stmt = stmt.where(Client.expires_at < func.now())
-            count_stmt = count_stmt.where(Client.expires_at < func.now())
+            conditions.append(Client.expires_at < func.now())
         elif expired is False:
-            stmt = stmt.where(Client.expires_at >= func.now())
-            count_stmt = count_stmt.where(Client.expires_at >= func.now())
+            conditions.append(Client.expires_at >= func.now())
+
+        # Оконный count(*) OVER() отдаёт список и общее количество
+        # одним запросом вместо двух round-trip'ов к БД.
+        # Широкий subscription_url (VARCHAR 1024) списку не нужен —
+        # выбираем только колонки, попадающие в ClientListItem.
+        stmt = (
+            select(Client, func.count().over().label("total"))
+            .options(
+                load_only(
+                    Client.id,
+                    Client.username,
+                    Client.remnawave_uuid,
+                    Client.short_uuid,
+                    Client.status,
+                    Client.expires_at,
+                    Client.created_at,
+                    Client.updated_at,
+                )
+            )
+            .where(*conditions)
+        )
 
-        stmt = stmt.order_by(Client.created_at.desc())
+        # Окно считается до LIMIT/OFFSET, поэтому total — полное
+        # количество с учётом фильтров, а не размер страницы.
+        stmt = stmt.order_by(Client.created_at.desc()).limit(limit).offset(offset)
 
         result = await self._session.execute(stmt)
-        clients = list(result.scalars().all())
-
-        count_result = await self._session.execute(count_stmt)
-        total = count_result.scalar() or 0
+        rows = result.all()
+        clients = [row[0] for row in rows]
+
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Страница за пределами выборки: окно пустое, но совпадения
+            # могут существовать — добираем количество отдельным COUNT.
+            count_stmt = (
+                select(func.count()).select_from(Client).where(*conditions)
+            )
+            total = await self._session.scalar(count_stmt) or 0
+        else:
+            total = 0
 
         return clients, total
 
     async def update(self, client: Client) -> Client:
         """Обновить данные клиента в БД.
 
+        Unit of Work: изменения уже отслеживаются сессией, UPDATE
+        уйдёт одним flush'ем при коммите в конце запроса вместе
+        с аудит-записью — без немедленного round-trip'а здесь.
+
         Args:
             client: Изменённый экземпляр клиента.
 
         Returns:
             Обновлённый клиент.
         """
-        await self._session.flush()
-        await self._session.refresh(client)
         return client
 
+    # CTE: смена статуса и аудит-запись одним запросом (enum'ы в БД
+    # хранятся по именам членов, поэтому приводим строки к типам явно)
+    _BLOCK_WITH_AUDIT_SQL = text(
+        """
+        WITH upd AS (
+            UPDATE clients
+            SET status = CAST(:status AS client_status),
+                updated_at = now()
+            WHERE id = :client_id
+            RETURNING id, updated_at
+        ),
+        audit AS (
+            INSERT INTO operations (id, client_id, action, result)
+            SELECT :operation_id,
+                   id,
+                   CAST(:action AS action_type),
+                   CAST(:result AS operation_result)
+            FROM upd
+        )
+        SELECT updated_at FROM upd
+        """
+    )
+
+    async def set_status_with_audit(
+        self,
+        client_id: uuid.UUID,
+        status: ClientStatus,
+        action: ActionType,
+    ) -> datetime | None:
+        """Сменить статус клиента и записать аудит одним запросом.
+
+        CTE `UPDATE ... RETURNING` + `INSERT` заменяет пару
+        UPDATE/INSERT — один round-trip на блокировку/разблокировку.
+
+        Args:
+            client_id: UUID клиента.
+            status: Новый статус клиента.
+            action: Тип операции для аудит-записи.
+
+        Returns:
+            Новое значение `updated_at` или None, если клиент
+            не найден.
+        """
+        result = await self._session.execute(
+            self._BLOCK_WITH_AUDIT_SQL,
+            {
+                "client_id": client_id,
+                "status": status.name,
+                "operation_id": uuid7(),
+                "action": action.name,
+                "result": OperationResult.SUCCESS.name,
+            },
+        )
+        return result.scalar_one_or_none()
+
     async def delete(self, client: Client) -> None:
         """Удалить клиента из БД.
 
@@ -120,17 +242,54 @@ class ClientRepository:
         await self._session.delete(client)
         await self._session.flush()
 
-    async def get_expired_active(self) -> list[Client]:
-        """Получить активных клиентов с истёкшей подпиской.
+    async def claim_expired_active(self) -> list[Row]:
+        """Заблокировать просроченных активных клиентов одним UPDATE.
 
-        Используется для автоматической деактивации.
+        Используется для автоматической деактивации: один
+        `UPDATE ... RETURNING` одновременно помечает клиентов и отдаёт
+        данные для вызовов RemnaWave и аудита — без отдельного SELECT
+        и гонки между выборкой и обновлением.
 
         Returns:
-            Список активных клиентов, у которых expires_at < now().
+            Строки (id, remnawave_uuid, expires_at) заблокированных
+            клиентов.
         """
-        stmt = select(Client).where(
-            Client.status == ClientStatus.ACTIVE,
-            Client.expires_at < func.now(),
+        stmt = (
+            update(Client)
+            .where(
+                # Статус — инлайн-литерал, а не bind-параметр: план,
+                # подготовленный asyncpg по параметру, может не выбрать
+                # частичный индекс clients_expired_active_idx.
+                Client.status
+                == bindparam(
+                    "active_status",
+                    ClientStatus.ACTIVE,
+                    literal_execute=True,
+                ),
+                Client.expires_at < func.now(),
+            )
+            .values(status=ClientStatus.BLOCKED)
+            .returning(Client.id, Client.remnawave_uuid, Client.expires_at)
         )
         result = await self._session.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
+
+    async def release_claimed(self, client_ids: list[uuid.UUID]) -> None:
+        """Вернуть клиентам статус ACTIVE после неудачной деактивации.
+
+        Клиенты, захваченные `claim_expired_active`, но не отключённые
+        в RemnaWave, возвращаются в ACTIVE одним bulk-UPDATE — иначе
+        они навсегда выпали бы из выборки следующих свипов, оставаясь
+        включёнными в панели.
+
+        Args:
+            client_ids: UUID клиентов для возврата в ACTIVE.
+        """
+        if not client_ids:
+            return
+        stmt = (
+            update(Client)
+            .where(Client.id.in_(client_ids))
+            .values(status=ClientStatus.ACTIVE)
+        )
+        await self._session.execute(stmt)
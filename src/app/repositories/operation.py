@@ -1,9 +1,10 @@
 """Репозиторий для работы с таблицей operations (аудит-лог)."""
 
 import uuid
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.operation import ActionType, Operation, OperationResult
@@ -39,8 +40,11 @@ class OperationRepository:
             error: Текст ошибки (если fail).
 
         Returns:
-            Созданная запись операции.
+            Созданная запись операции (ещё не отправленная в БД).
         """
+        # Unit of Work: запись только регистрируется в сессии, INSERT
+        # уходит одним flush'ем при коммите в конце запроса — без
+        # отдельного round-trip'а на каждую аудит-запись.
         operation = Operation(
             client_id=client_id,
             action=action,
@@ -49,35 +53,66 @@ class OperationRepository:
             error=error,
         )
         self._session.add(operation)
-        await self._session.flush()
-        await self._session.refresh(operation)
         return operation
 
+    # Лимит строк на один multi-values INSERT (insertmanyvalues)
+    _INSERT_BATCH_SIZE = 1000
+
+    async def create_many(self, rows: list[dict[str, Any]]) -> None:
+        """Вставить пакет записей аудит-лога (insertmanyvalues).
+
+        Core-вставка со списком параметров позволяет SQLAlchemy собрать
+        multi-values INSERT; пакеты режутся по 1000 строк, чтобы не
+        упереться в лимиты бэкенда. Записи write-only: серверные поля
+        обратно не читаются, refresh не выполняется.
+
+        Args:
+            rows: Список словарей с полями модели Operation.
+        """
+        for start in range(0, len(rows), self._INSERT_BATCH_SIZE):
+            batch = rows[start : start + self._INSERT_BATCH_SIZE]
+            await self._session.execute(insert(Operation), batch)
+
     async def get_by_client_id(
         self,
         client_id: uuid.UUID,
-    ) -> tuple[list[Operation], int]:
-        """Получить операции по UUID клиента.
+        after: tuple[datetime, uuid.UUID] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[Operation], tuple[datetime, uuid.UUID] | None]:
+        """Получить страницу операций по UUID клиента (keyset-пагинация).
+
+        Курсор `(created_at, id)` вместо OFFSET: память ограничена
+        размером страницы, а глубокие страницы не сканируют и не
+        отбрасывают предыдущие строки. Выборка опирается на составной
+        индекс (client_id, created_at).
 
         Args:
             client_id: UUID клиента.
+            after: Курсор — пара (created_at, id) последней строки
+                предыдущей страницы; None для первой страницы.
+            limit: Максимальный размер страницы.
 
         Returns:
-            Кортеж (список операций, общее количество).
+            Кортеж (страница операций, курсор следующей страницы или
+            None, если журнал исчерпан).
         """
         stmt = (
             select(Operation)
             .where(Operation.client_id == client_id)
-            .order_by(Operation.created_at.desc())
-        )
-        count_stmt = select(func.count(Operation.id)).where(
-            Operation.client_id == client_id
+            .order_by(Operation.created_at.desc(), Operation.id.desc())
+            .limit(limit)
         )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(Operation.created_at, Operation.id) < after
+            )
 
         result = await self._session.execute(stmt)
         operations = list(result.scalars().all())
 
-        count_result = await self._session.execute(count_stmt)
-        total = count_result.scalar() or 0
+        next_cursor = None
+        if len(operations) == limit:
+            last = operations[-1]
+            next_cursor = (last.created_at, last.id)
 
-        return operations, total
+        return operations, next_cursor
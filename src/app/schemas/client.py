@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 from app.models.client import ClientStatus
 
@@ -58,20 +58,40 @@ class ClientResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    model_config = {"from_attributes": True}
+    # use_enum_values: статус хранится сразу строкой — сериализация
+    # ответа не коэрсит enum на каждом объекте
+    model_config = {"from_attributes": True, "use_enum_values": True}
 
 
-class ClientCreateResponse(BaseModel):
-    """Ответ при создании клиента — возвращаем только id."""
+class ClientListItem(BaseModel):
+    """Элемент списка клиентов.
+
+    Урезанная версия `ClientResponse` без широкого `subscription_url`:
+    колонка не выбирается из БД на списочном эндпоинте.
+    """
 
     id: uuid.UUID
+    username: str
+    remnawave_uuid: str | None
+    short_uuid: str | None
+    status: ClientStatus
+    expires_at: datetime
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True, "use_enum_values": True}
+
 
+# Скомпилированный один раз (при импорте) валидатор списка: страница
+# клиентов сериализуется одним проходом на уровне Rust вместо
+# покадрового model_validate.
+CLIENT_LIST_ADAPTER = TypeAdapter(list[ClientListItem])
 
-class ClientListResponse(BaseModel):
-    """Список клиентов с мета-информацией."""
 
-    items: list[ClientResponse]
-    total: int
+class ClientCreateResponse(BaseModel):
+    """Ответ при создании клиента — возвращаем только id."""
+
+    id: uuid.UUID
 
 
 class ConfigResponse(BaseModel):
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from app.models.operation import ActionType, OperationResult
 
@@ -20,11 +20,11 @@ class OperationResponse(BaseModel):
     error: str | None
     created_at: datetime
 
-    model_config = {"from_attributes": True}
+    # use_enum_values: enum хранится сразу строкой — model_dump
+    # на списочных эндпоинтах не коэрсит enum на каждой строке
+    model_config = {"from_attributes": True, "use_enum_values": True}
 
 
-class OperationListResponse(BaseModel):
-    """Список операций с мета-информацией."""
-
-    items: list[OperationResponse]
-    total: int
+# Скомпилированный один раз (при импорте) валидатор списка — страница
+# журнала сериализуется одним проходом вместо покадрового model_validate.
+OPERATION_LIST_ADAPTER = TypeAdapter(list[OperationResponse])
@@ -4,17 +4,19 @@
 Все операции логируются в таблицу operations (аудит).
 """
 
+import asyncio
 import logging
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import UTC, datetime, timedelta
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.exceptions.handlers import (
-    ClientAlreadyBlockedError,
+    CLIENT_ALREADY_BLOCKED,
+    CLIENT_CONFIG_UNAVAILABLE,
+    CLIENT_NOT_BLOCKED,
     ClientAlreadyExistsError,
-    ClientConfigUnavailableError,
-    ClientNotBlockedError,
     ClientNotFoundError,
     RemnawaveIntegrationError,
 )
@@ -22,6 +24,7 @@ from app.models.client import Client, ClientStatus
 from app.models.operation import ActionType, OperationResult
 from app.repositories.client import ClientRepository
 from app.repositories.operation import OperationRepository
+from app.schemas.client import ConfigResponse
 from app.services.remnawave import RemnawaveService
 
 logger = logging.getLogger(__name__)
@@ -38,31 +41,66 @@ class ClientService:
     - Запись всех операций в аудит-лог.
 
     Attributes:
+        _session: Асинхронная сессия SQLAlchemy (одна на запрос).
         _client_repo: Репозиторий клиентов.
-        _operation_repo: Репозиторий операций (аудит, основная сессия).
-        _audit_repo: Репозиторий операций (аудит ошибок, независимая сессия).
+        _operation_repo: Репозиторий операций (аудит).
+        _audit_session_factory: Фабрика сессий для аудита ошибок.
         _remnawave: Адаптер RemnaWave SDK.
+        _deactivate_concurrency: Лимит параллельных вызовов RemnaWave
+            при массовой деактивации.
     """
 
+    # Размер порции expiry-свипа: ограничивает пиковую память
+    _DEACTIVATE_PARTITION_SIZE = 500
+
     def __init__(
         self,
         session: AsyncSession,
-        audit_session: AsyncSession,
         remnawave: RemnawaveService,
+        audit_session_factory: async_sessionmaker[AsyncSession],
+        deactivate_concurrency: int = 16,
     ) -> None:
+        self._session = session
         self._client_repo = ClientRepository(session)
         self._operation_repo = OperationRepository(session)
-        self._audit_repo = OperationRepository(audit_session)
+        self._audit_session_factory = audit_session_factory
         self._remnawave = remnawave
+        self._deactivate_concurrency = deactivate_concurrency
+
+    async def _write_fail_audit(
+        self,
+        client_id: uuid.UUID,
+        action: ActionType,
+        payload: dict | None,
+        error: str,
+    ) -> None:
+        """Записать FAIL-запись аудита в независимой сессии.
+
+        Сессия открывается из фабрики только здесь, на пути сбоя, и
+        коммитится отдельно — запись сохраняется даже при rollback
+        основной транзакции, а успешные запросы не платят за второе
+        подключение из пула.
+        """
+        async with self._audit_session_factory() as session:
+            await OperationRepository(session).create(
+                client_id=client_id,
+                action=action,
+                payload=payload,
+                result=OperationResult.FAIL,
+                error=error,
+            )
+            await session.commit()
 
     # ── Создание клиента ─────────────────────────────────
 
     async def create_client(self, username: str, days: int = 30) -> Client:
         """Создать нового VPN-клиента.
 
-        1. Проверяет уникальность username в нашей БД.
+        1. Проверяет, что username свободен (дешёвый локальный SELECT).
         2. Создаёт пользователя в RemnaWave.
-        3. Сохраняет клиента в локальную БД.
+        3. Сохраняет клиента в локальную БД
+           (`INSERT ... ON CONFLICT DO NOTHING` закрывает гонку
+           между проверкой и вставкой).
         4. Пишет аудит-лог.
 
         При ошибке сохранения в БД выполняется компенсация:
@@ -79,12 +117,14 @@ class ClientService:
             ClientAlreadyExistsError: Клиент с таким username уже есть.
             RemnawaveIntegrationError: Ошибка создания в RemnaWave.
         """
-        # Проверка на дубли
-        existing = await self._client_repo.get_by_username(username)
-        if existing is not None:
+        # Типовой дубликат отсекаем локально, без round-trip'а к панели
+        # (у занятого username пользователь в RemnaWave уже есть, и её
+        # ошибка конфликта превратилась бы в 502 вместо 409). Гонку
+        # между этой проверкой и вставкой закрывает insert_if_absent.
+        if await self._client_repo.get_by_username(username) is not None:
             raise ClientAlreadyExistsError(username)
 
-        expire_at = datetime.now(tz=timezone.utc) + timedelta(days=days)
+        expire_at = datetime.now(UTC) + timedelta(days=days)
 
         # Создаём в RemnaWave
         try:
@@ -106,7 +146,7 @@ class ClientService:
             expires_at=expire_at,
         )
         try:
-            client = await self._client_repo.create(client)
+            saved = await self._client_repo.insert_if_absent(client)
         except Exception as exc:
             logger.error("Ошибка сохранения клиента в БД: %s", exc)
             # Компенсация: удаляем «сироту» из RemnaWave
@@ -120,6 +160,20 @@ class ClientService:
                 )
             raise RemnawaveIntegrationError() from exc
 
+        if saved is None:
+            # username занят конкурентом — пользователь в RemnaWave лишний
+            try:
+                await self._remnawave.delete_user(rw_user.uuid)
+            except Exception as cleanup_exc:
+                logger.critical(
+                    "Не удалось удалить сироту в RemnaWave (uuid=%s): %s",
+                    rw_user.uuid,
+                    cleanup_exc,
+                )
+            raise ClientAlreadyExistsError(username)
+
+        client = saved
+
         # Аудит
         await self._operation_repo.create(
             client_id=client.id,
@@ -153,17 +207,26 @@ class ClientService:
         self,
         status: ClientStatus | None = None,
         expired: bool | None = None,
+        limit: int = 50,
+        offset: int = 0,
     ) -> tuple[list[Client], int]:
-        """Получить список клиентов с фильтрами.
+        """Получить страницу списка клиентов с фильтрами.
 
         Args:
             status: Фильтр по статусу.
             expired: Фильтр по истечению подписки.
+            limit: Максимальный размер страницы.
+            offset: Смещение от начала списка.
 
         Returns:
-            Кортеж (список клиентов, общее количество).
+            Кортеж (страница клиентов, общее количество).
         """
-        return await self._client_repo.get_list(status=status, expired=expired)
+        return await self._client_repo.get_list(
+            status=status,
+            expired=expired,
+            limit=limit,
+            offset=offset,
+        )
 
     # ── Удаление клиента ─────────────────────────────────
 
@@ -182,27 +245,27 @@ class ClientService:
         """
         client = await self.get_client(client_id)
 
-        # Аудит пишем ДО удаления (иначе FK сломается)
         try:
             if client.remnawave_uuid:
                 await self._remnawave.delete_user(client.remnawave_uuid)
-            await self._operation_repo.create(
-                client_id=client.id,
-                action=ActionType.DELETE,
-                payload=None,
-                result=OperationResult.SUCCESS,
-            )
         except Exception as exc:
-            await self._audit_repo.create(
+            await self._write_fail_audit(
                 client_id=client.id,
                 action=ActionType.DELETE,
                 payload=None,
-                result=OperationResult.FAIL,
                 error=str(exc),
             )
             logger.error("Ошибка удаления пользователя в RemnaWave: %s", exc)
             raise RemnawaveIntegrationError() from exc
 
+        # Аудит регистрируем ДО удаления: flush внутри delete отправит
+        # INSERT раньше DELETE и не нарушит FK.
+        await self._operation_repo.create(
+            client_id=client.id,
+            action=ActionType.DELETE,
+            payload=None,
+            result=OperationResult.SUCCESS,
+        )
         await self._client_repo.delete(client)
 
     # ── Продление подписки ───────────────────────────────
@@ -226,7 +289,7 @@ class ClientService:
         """
         client = await self.get_client(client_id)
 
-        now = datetime.now(tz=timezone.utc)
+        now = datetime.now(UTC)
         base_date = max(client.expires_at, now)
         new_expires_at = base_date + timedelta(days=days)
 
@@ -237,11 +300,10 @@ class ClientService:
                     expire_at=new_expires_at,
                 )
         except Exception as exc:
-            await self._audit_repo.create(
+            await self._write_fail_audit(
                 client_id=client.id,
                 action=ActionType.EXTEND,
                 payload={"days": days},
-                result=OperationResult.FAIL,
                 error=str(exc),
             )
             logger.error("Ошибка продления подписки в RemnaWave: %s", exc)
@@ -253,7 +315,8 @@ class ClientService:
         await self._operation_repo.create(
             client_id=client.id,
             action=ActionType.EXTEND,
-            payload={"days": days, "new_expires_at": new_expires_at.isoformat()},
+            # datetime сериализует orjson на уровне движка — без isoformat()
+            payload={"days": days, "new_expires_at": new_expires_at},
             result=OperationResult.SUCCESS,
         )
 
@@ -276,31 +339,32 @@ class ClientService:
         client = await self.get_client(client_id)
 
         if client.status == ClientStatus.BLOCKED:
-            raise ClientAlreadyBlockedError()
+            raise CLIENT_ALREADY_BLOCKED
 
         try:
             if client.remnawave_uuid:
                 await self._remnawave.disable_user(client.remnawave_uuid)
         except Exception as exc:
-            await self._audit_repo.create(
+            await self._write_fail_audit(
                 client_id=client.id,
                 action=ActionType.BLOCK,
                 payload=None,
-                result=OperationResult.FAIL,
                 error=str(exc),
             )
             logger.error("Ошибка блокировки пользователя в RemnaWave: %s", exc)
             raise RemnawaveIntegrationError() from exc
 
-        client.status = ClientStatus.BLOCKED
-        client = await self._client_repo.update(client)
-
-        await self._operation_repo.create(
+        # UPDATE статуса и аудит-INSERT объединены в один CTE-запрос;
+        # новые значения в памяти помечаем как уже записанные, чтобы
+        # flush не выпустил второй UPDATE.
+        updated_at = await self._client_repo.set_status_with_audit(
             client_id=client.id,
+            status=ClientStatus.BLOCKED,
             action=ActionType.BLOCK,
-            payload=None,
-            result=OperationResult.SUCCESS,
         )
+        set_committed_value(client, "status", ClientStatus.BLOCKED)
+        if updated_at is not None:
+            set_committed_value(client, "updated_at", updated_at)
 
         return client
 
@@ -319,31 +383,30 @@ class ClientService:
         client = await self.get_client(client_id)
 
         if client.status != ClientStatus.BLOCKED:
-            raise ClientNotBlockedError()
+            raise CLIENT_NOT_BLOCKED
 
         try:
             if client.remnawave_uuid:
                 await self._remnawave.enable_user(client.remnawave_uuid)
         except Exception as exc:
-            await self._audit_repo.create(
+            await self._write_fail_audit(
                 client_id=client.id,
                 action=ActionType.UNBLOCK,
                 payload=None,
-                result=OperationResult.FAIL,
                 error=str(exc),
             )
             logger.error("Ошибка разблокировки пользователя в RemnaWave: %s", exc)
             raise RemnawaveIntegrationError() from exc
 
-        client.status = ClientStatus.ACTIVE
-        client = await self._client_repo.update(client)
-
-        await self._operation_repo.create(
+        # Тот же CTE, что и в block_client, — один round-trip
+        updated_at = await self._client_repo.set_status_with_audit(
             client_id=client.id,
+            status=ClientStatus.ACTIVE,
             action=ActionType.UNBLOCK,
-            payload=None,
-            result=OperationResult.SUCCESS,
         )
+        set_committed_value(client, "status", ClientStatus.ACTIVE)
+        if updated_at is not None:
+            set_committed_value(client, "updated_at", updated_at)
 
         return client
 
@@ -352,14 +415,14 @@ class ClientService:
     async def get_config(
         self,
         client_id: uuid.UUID,
-    ) -> dict[str, str]:
+    ) -> ConfigResponse:
         """Получить конфигурацию подключения клиента.
 
         Args:
             client_id: UUID клиента.
 
         Returns:
-            Словарь с данными конфигурации.
+            DTO с данными конфигурации.
 
         Raises:
             ClientConfigUnavailableError: Нет привязки к RemnaWave.
@@ -367,18 +430,17 @@ class ClientService:
         client = await self.get_client(client_id)
 
         if not client.short_uuid:
-            raise ClientConfigUnavailableError()
+            raise CLIENT_CONFIG_UNAVAILABLE
 
         try:
             config_data = await self._remnawave.get_subscription_config(
                 short_uuid=client.short_uuid,
             )
         except Exception as exc:
-            await self._audit_repo.create(
+            await self._write_fail_audit(
                 client_id=client.id,
                 action=ActionType.GET_CONFIG,
                 payload=None,
-                result=OperationResult.FAIL,
                 error=str(exc),
             )
             logger.error("Ошибка получения конфигурации из RemnaWave: %s", exc)
@@ -391,12 +453,14 @@ class ClientService:
             result=OperationResult.SUCCESS,
         )
 
-        return {
-            "client_id": str(client.id),
-            "short_uuid": client.short_uuid,
-            "subscription_url": client.subscription_url or "",
-            "config_data": config_data,
-        }
+        # model_construct: данные доверенные (своя БД + SDK), повторная
+        # валидация и str() поверх UUID на горячем пути не нужны.
+        return ConfigResponse.model_construct(
+            client_id=client.id,
+            short_uuid=client.short_uuid,
+            subscription_url=client.subscription_url or "",
+            config_data=config_data,
+        )
 
     async def rotate_config(self, client_id: uuid.UUID) -> Client:
         """Перевыпустить конфигурацию (ротация ключа).
@@ -416,18 +480,17 @@ class ClientService:
         client = await self.get_client(client_id)
 
         if not client.remnawave_uuid:
-            raise ClientConfigUnavailableError()
+            raise CLIENT_CONFIG_UNAVAILABLE
 
         try:
             rw_user = await self._remnawave.revoke_subscription(
                 remnawave_uuid=client.remnawave_uuid,
             )
         except Exception as exc:
-            await self._audit_repo.create(
+            await self._write_fail_audit(
                 client_id=client.id,
                 action=ActionType.ROTATE_CONFIG,
                 payload=None,
-                result=OperationResult.FAIL,
                 error=str(exc),
             )
             logger.error("Ошибка ротации конфигурации в RemnaWave: %s", exc)
@@ -451,42 +514,77 @@ class ClientService:
     async def deactivate_expired(self) -> int:
         """Заблокировать всех активных клиентов с истёкшей подпиской.
 
-        Для каждого просроченного клиента:
-        1. Отключает доступ в RemnaWave.
-        2. Меняет статус на BLOCKED в локальной БД.
-        3. Пишет аудит-лог.
+        Один `UPDATE ... RETURNING` помечает клиентов заблокированными
+        и отдаёт данные для отключения доступа в RemnaWave и аудита —
+        без SELECT→UPDATE-гонки и round-trip'ов на каждого клиента.
+        Обработка идёт порциями: пиковая память (результаты gather,
+        строки аудита) ограничена размером порции, а не размером
+        всего бэклога после простоя.
 
         Returns:
             Количество деактивированных клиентов.
         """
-        expired_clients = await self._client_repo.get_expired_active()
-        count = 0
+        claimed = await self._client_repo.claim_expired_active()
+
+        # Вызовы RemnaWave независимы друг от друга — выполняем их
+        # параллельно, ограничивая семафором число одновременных
+        # запросов, чтобы не перегружать панель.
+        semaphore = asyncio.Semaphore(self._deactivate_concurrency)
+
+        async def _disable(row) -> Exception | None:  # noqa: ANN001
+            async with semaphore:
+                try:
+                    if row.remnawave_uuid:
+                        await self._remnawave.disable_user(row.remnawave_uuid)
+                except Exception as exc:
+                    return exc
+                return None
 
-        for client in expired_clients:
-            try:
-                if client.remnawave_uuid:
-                    await self._remnawave.disable_user(client.remnawave_uuid)
+        count = 0
 
-                client.status = ClientStatus.BLOCKED
-                await self._client_repo.update(client)
+        for start in range(0, len(claimed), self._DEACTIVATE_PARTITION_SIZE):
+            partition = claimed[start : start + self._DEACTIVATE_PARTITION_SIZE]
+            results = await asyncio.gather(
+                *(_disable(row) for row in partition)
+            )
 
-                await self._operation_repo.create(
-                    client_id=client.id,
-                    action=ActionType.AUTO_DEACTIVATE,
-                    payload={"expired_at": client.expires_at.isoformat()},
-                    result=OperationResult.SUCCESS,
-                )
-                count += 1
-            except Exception as exc:
-                await self._audit_repo.create(
-                    client_id=client.id,
-                    action=ActionType.AUTO_DEACTIVATE,
-                    payload={"expired_at": client.expires_at.isoformat()},
-                    result=OperationResult.FAIL,
-                    error=str(exc),
-                )
-                logger.error(
-                    "Ошибка деактивации клиента %s: %s", client.id, exc,
-                )
+            audit_rows: list[dict] = []
+            failed_ids: list[uuid.UUID] = []
+            for row, exc in zip(partition, results):
+                if exc is None:
+                    audit_rows.append(
+                        {
+                            "client_id": row.id,
+                            "action": ActionType.AUTO_DEACTIVATE,
+                            "payload": {"expired_at": row.expires_at},
+                            "result": OperationResult.SUCCESS,
+                            "error": None,
+                        }
+                    )
+                    count += 1
+                else:
+                    audit_rows.append(
+                        {
+                            "client_id": row.id,
+                            "action": ActionType.AUTO_DEACTIVATE,
+                            "payload": {"expired_at": row.expires_at},
+                            "result": OperationResult.FAIL,
+                            "error": str(exc),
+                        }
+                    )
+                    failed_ids.append(row.id)
+                    logger.error(
+                        "Ошибка деактивации клиента %s: %s", row.id, exc,
+                    )
+
+            # Неотключённых в RemnaWave возвращаем в ACTIVE в той же
+            # транзакции: иначе они выпали бы из выборки следующих
+            # свипов и остались включёнными в панели навсегда.
+            await self._client_repo.release_claimed(failed_ids)
+
+            # Один пакетный INSERT аудита на порцию. Ошибки здесь
+            # не откатывают транзакцию запроса, поэтому FAIL-записи
+            # безопасно писать в основную сессию.
+            await self._operation_repo.create_many(audit_rows)
 
         return count
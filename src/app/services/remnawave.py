@@ -4,10 +4,16 @@
 Используется бизнес-логикой (ClientService) через Dependency Injection.
 """
 
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import datetime
+from typing import TypeVar
 
+import httpx
 from remnawave import RemnawaveSDK
+from remnawave.exceptions import ApiError
 from remnawave.models import (
     CreateUserRequestDto,
     RevokeUserRequestDto,
@@ -16,8 +22,12 @@ from remnawave.models import (
 
 from app.config import Settings
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+T = TypeVar("T")
+
+
+@dataclass(slots=True, frozen=True)
 class RemnawaveUserResult:
     """Результат операции с пользователем RemnaWave."""
 
@@ -28,26 +38,135 @@ class RemnawaveUserResult:
     status: str
 
 
+def _to_result(user) -> RemnawaveUserResult:  # noqa: ANN001 — DTO SDK
+    """Собрать RemnawaveUserResult из DTO пользователя SDK."""
+    raw_uuid = user.uuid
+    return RemnawaveUserResult(
+        uuid=raw_uuid if isinstance(raw_uuid, str) else str(raw_uuid),
+        username=user.username,
+        short_uuid=user.short_uuid,
+        subscription_url=user.subscription_url,
+        status=user.status,
+    )
+
+
+def build_sdk(settings: Settings) -> RemnawaveSDK:
+    """Собрать процесс-синглтон RemnaWave SDK поверх общего HTTP-клиента.
+
+    Вызывается один раз в `lifespan` приложения: TCP/TLS-соединения
+    к панели переиспользуются между запросами вместо рукопожатия
+    на каждый вызов.
+
+    Args:
+        settings: Конфигурация приложения с URL и токеном RemnaWave.
+
+    Returns:
+        Экземпляр RemnawaveSDK с настроенным пулом соединений.
+    """
+    # Конфигурация клиента повторяет соглашения RemnaWave SDK:
+    # суффикс /api в base_url и Bearer-авторизация.
+    base_url = settings.remnawave_base_url.rstrip("/")
+    if not base_url.endswith("/api"):
+        base_url += "/api"
+
+    token = settings.remnawave_api_token
+    headers = {
+        "Authorization": token
+        if token.startswith("Bearer ")
+        else f"Bearer {token}",
+    }
+    if base_url.startswith("http://"):
+        # Панель за reverse proxy ожидает эти заголовки на http
+        headers["x-forwarded-proto"] = "https"
+        headers["x-forwarded-for"] = "127.0.0.1"
+
+    http_client = httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        limits=httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+        ),
+    )
+    return RemnawaveSDK(client=http_client)
+
+
 class RemnawaveService:
     """Адаптер для работы с RemnaWave API через Python SDK.
 
     Инкапсулирует все вызовы к панели RemnaWave.
     Предоставляет типизированный интерфейс для бизнес-логики.
 
+    Сервис создаётся один раз на процесс (в `lifespan`) поверх общего
+    SDK из `build_sdk` — warm-пул соединений живёт весь срок процесса.
+    Все вызовы проходят через `_call`: семафор ограничивает число
+    одновременных запросов к панели, ответы 429 повторяются с
+    неблокирующей паузой (`asyncio.sleep`).
+
     Attributes:
-        _sdk: Экземпляр RemnaWave SDK.
+        _sdk: Общий экземпляр RemnaWave SDK.
+        _sem: Глобальный лимит одновременных запросов к панели.
     """
 
-    def __init__(self, settings: Settings) -> None:
-        """Инициализация SDK-клиента.
+    # Максимум попыток вызова при 429 Too Many Requests
+    _MAX_RETRIES = 3
+    # Базовая пауза между повторами (растёт линейно от попытки)
+    _DEFAULT_RETRY_DELAY = 1.0
+    # Потолок паузы: повтор не должен удерживать слот семафора долго
+    _MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, sdk: RemnawaveSDK, concurrency: int = 32) -> None:
+        """Инициализация адаптера поверх общего SDK.
 
         Args:
-            settings: Конфигурация приложения с URL и токеном RemnaWave.
+            sdk: Процесс-синглтон RemnaWave SDK (из `build_sdk`).
+            concurrency: Лимит одновременных запросов к панели.
         """
-        self._sdk = RemnawaveSDK(
-            base_url=settings.remnawave_base_url,
-            token=settings.remnawave_api_token,
-        )
+        self._sdk = sdk
+        self._sem = asyncio.Semaphore(concurrency)
+
+    async def _call(self, coro_factory: Callable[[], Awaitable[T]]) -> T:
+        """Выполнить вызов SDK под семафором с повтором при 429.
+
+        SDK сам перехватывает HTTP-ошибки панели и поднимает свою
+        иерархию `ApiError` (не `httpx.HTTPStatusError`) — ловим её
+        и смотрим на `status_code`. Заголовков (Retry-After) в
+        `ApiError` нет, поэтому пауза растёт линейно от попытки
+        к попытке, с потолком `_MAX_RETRY_DELAY`.
+
+        Args:
+            coro_factory: Фабрика корутины SDK-вызова (корутину нельзя
+                переиспользовать, поэтому на повтор создаётся новая).
+
+        Returns:
+            Результат вызова SDK.
+        """
+        async with self._sem:
+            for attempt in range(1, self._MAX_RETRIES):
+                try:
+                    return await coro_factory()
+                except ApiError as exc:
+                    if exc.status_code != 429:
+                        raise
+                    delay = min(
+                        self._DEFAULT_RETRY_DELAY * attempt,
+                        self._MAX_RETRY_DELAY,
+                    )
+                    logger.warning(
+                        "RemnaWave ответила 429, повтор через %s с "
+                        "(попытка %d/%d)",
+                        delay,
+                        attempt,
+                        self._MAX_RETRIES,
+                    )
+                    await asyncio.sleep(delay)
+            # Последняя попытка — без перехвата 429: повторы исчерпаны
+            return await coro_factory()
+
+    async def aclose(self) -> None:
+        """Закрыть HTTP-клиент SDK (вызывается при остановке приложения)."""
+        # SDK не предоставляет публичного close — закрываем его клиент.
+        await self._sdk._client.aclose()
 
     async def create_user(
         self,
@@ -63,20 +182,16 @@ class RemnawaveService:
         Returns:
             Данные созданного пользователя.
         """
-        user = await self._sdk.users.create_user(
-            CreateUserRequestDto(
-                username=username,
-                status="ACTIVE",
-                expire_at=expire_at,
+        user = await self._call(
+            lambda: self._sdk.users.create_user(
+                CreateUserRequestDto(
+                    username=username,
+                    status="ACTIVE",
+                    expire_at=expire_at,
+                )
             )
         )
-        return RemnawaveUserResult(
-            uuid=str(user.uuid),
-            username=user.username,
-            short_uuid=user.short_uuid,
-            subscription_url=user.subscription_url,
-            status=user.status,
-        )
+        return _to_result(user)
 
     async def get_user(self, remnawave_uuid: str) -> RemnawaveUserResult:
         """Получить пользователя по UUID из RemnaWave.
@@ -87,14 +202,10 @@ class RemnawaveService:
         Returns:
             Данные пользователя.
         """
-        user = await self._sdk.users.get_user_by_uuid(uuid=remnawave_uuid)
-        return RemnawaveUserResult(
-            uuid=str(user.uuid),
-            username=user.username,
-            short_uuid=user.short_uuid,
-            subscription_url=user.subscription_url,
-            status=user.status,
+        user = await self._call(
+            lambda: self._sdk.users.get_user_by_uuid(uuid=remnawave_uuid)
         )
+        return _to_result(user)
 
     async def disable_user(self, remnawave_uuid: str) -> RemnawaveUserResult:
         """Заблокировать пользователя в RemnaWave (отключить доступ).
@@ -105,14 +216,10 @@ class RemnawaveService:
         Returns:
             Обновлённые данные пользователя.
         """
-        user = await self._sdk.users.disable_user(uuid=remnawave_uuid)
-        return RemnawaveUserResult(
-            uuid=str(user.uuid),
-            username=user.username,
-            short_uuid=user.short_uuid,
-            subscription_url=user.subscription_url,
-            status=user.status,
+        user = await self._call(
+            lambda: self._sdk.users.disable_user(uuid=remnawave_uuid)
         )
+        return _to_result(user)
 
     async def enable_user(self, remnawave_uuid: str) -> RemnawaveUserResult:
         """Разблокировать пользователя в RemnaWave (включить доступ).
@@ -123,14 +230,10 @@ class RemnawaveService:
         Returns:
             Обновлённые данные пользователя.
         """
-        user = await self._sdk.users.enable_user(uuid=remnawave_uuid)
-        return RemnawaveUserResult(
-            uuid=str(user.uuid),
-            username=user.username,
-            short_uuid=user.short_uuid,
-            subscription_url=user.subscription_url,
-            status=user.status,
+        user = await self._call(
+            lambda: self._sdk.users.enable_user(uuid=remnawave_uuid)
         )
+        return _to_result(user)
 
     async def delete_user(self, remnawave_uuid: str) -> None:
         """Удалить пользователя из RemnaWave.
@@ -138,7 +241,9 @@ class RemnawaveService:
         Args:
             remnawave_uuid: UUID пользователя в RemnaWave.
         """
-        await self._sdk.users.delete_user(uuid=remnawave_uuid)
+        await self._call(
+            lambda: self._sdk.users.delete_user(uuid=remnawave_uuid)
+        )
 
     async def update_expire_at(
         self,
@@ -154,19 +259,15 @@ class RemnawaveService:
         Returns:
             Обновлённые данные пользователя.
         """
-        user = await self._sdk.users.update_user(
-            UpdateUserRequestDto(
-                uuid=remnawave_uuid,
-                expire_at=expire_at,
+        user = await self._call(
+            lambda: self._sdk.users.update_user(
+                UpdateUserRequestDto(
+                    uuid=remnawave_uuid,
+                    expire_at=expire_at,
+                )
             )
         )
-        return RemnawaveUserResult(
-            uuid=str(user.uuid),
-            username=user.username,
-            short_uuid=user.short_uuid,
-            subscription_url=user.subscription_url,
-            status=user.status,
-        )
+        return _to_result(user)
 
     async def get_subscription_config(self, short_uuid: str) -> str:
         """Получить конфигурацию подписки (base64).
@@ -177,8 +278,10 @@ class RemnawaveService:
         Returns:
             Строка конфигурации в формате base64.
         """
-        config: str = await self._sdk.subscription.get_subscription(
-            short_uuid=short_uuid,
+        config: str = await self._call(
+            lambda: self._sdk.subscription.get_subscription(
+                short_uuid=short_uuid,
+            )
         )
         return config
 
@@ -197,14 +300,10 @@ class RemnawaveService:
         Returns:
             Обновлённые данные с новым short_uuid.
         """
-        user = await self._sdk.users.revoke_user_subscription(
-            uuid=remnawave_uuid,
-            body=RevokeUserRequestDto(),
-        )
-        return RemnawaveUserResult(
-            uuid=str(user.uuid),
-            username=user.username,
-            short_uuid=user.short_uuid,
-            subscription_url=user.subscription_url,
-            status=user.status,
+        user = await self._call(
+            lambda: self._sdk.users.revoke_user_subscription(
+                uuid=remnawave_uuid,
+                body=RevokeUserRequestDto(),
+            )
         )
+        return _to_result(user)
@@ -1,7 +1,160 @@
 """Общие фикстуры для unit-тестов."""
 
+import itertools
 import sys
+import uuid
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 
 # Добавляем src в PYTHONPATH для корректного импорта
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from app.models.client import Client, ClientStatus  # noqa: E402
+from app.services.client import ClientService  # noqa: E402
+from app.services.remnawave import RemnawaveUserResult  # noqa: E402
+
+# Единый «замороженный» момент времени для всех тестов: убирает
+# syscall на каждый datetime.now и делает проверки дат точными (==)
+FROZEN_NOW = datetime(2026, 8, 26, 12, 0, 0, tzinfo=timezone.utc)
+
+# Детерминированные UUID вместо uuid4: значение в тестах не важно,
+# а uuid4 на каждый вызов читает энтропию из ОС.
+_uuid_counter = itertools.count(1)
+
+
+def next_uuid() -> uuid.UUID:
+    """Следующий детерминированный UUID для тестовых объектов."""
+    return uuid.UUID(int=next(_uuid_counter))
+
+
+# Предвычисленные интервалы для тестовых дат: все сроки в тестах —
+# статические константы, пересоздавать timedelta в каждом тесте незачем.
+TD = {days: timedelta(days=days) for days in (-5, 10, 15, 30)}
+
+
+# Константа уровня модуля: датакласс заморожен (frozen=True), один
+# экземпляр безопасно разделяется всеми тестами без пересоздания.
+DEFAULT_RW_RESULT = RemnawaveUserResult(
+    uuid="rw-uuid-123",
+    username="test_user",
+    short_uuid="short-abc",
+    subscription_url="https://vpn.example.com/sub/test_user",
+    status="active",
+)
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch: pytest.MonkeyPatch) -> datetime:
+    """Заморозить часы в сервисном слое на FROZEN_NOW."""
+
+    class _FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):  # noqa: ANN001
+            return FROZEN_NOW if tz is not None else FROZEN_NOW.replace(
+                tzinfo=None
+            )
+
+    monkeypatch.setattr("app.services.client.datetime", _FrozenDatetime)
+    return FROZEN_NOW
+
+
+@pytest.fixture(scope="session")
+def client_defaults() -> dict:
+    """Неизменяемые поля тестового клиента.
+
+    Вычисляются один раз на сессию: UUID и строковые константы
+    не пересоздаются в каждом тесте.
+    """
+    return {
+        "id": next_uuid(),
+        "username": "test_user",
+        "remnawave_uuid": "rw-uuid-123",
+        "short_uuid": "short-abc",
+        "subscription_url": "https://vpn.example.com/sub/test_user",
+    }
+
+
+@pytest.fixture
+def make_client(client_defaults: dict):
+    """Фабрика тестовых клиентов.
+
+    Тесты варьируют только статус и срок подписки — остальные поля
+    берутся из session-scoped шаблона.
+    """
+
+    def _factory(
+        status: ClientStatus = ClientStatus.ACTIVE,
+        days_until_expire: int = 30,
+    ) -> Client:
+        return Client(
+            **client_defaults,
+            status=status,
+            expires_at=FROZEN_NOW + TD[days_until_expire],
+        )
+
+    return _factory
+
+
+@pytest.fixture(scope="session")
+def rw_result() -> RemnawaveUserResult:
+    """Общий результат операции RemnaWave (константа DEFAULT_RW_RESULT)."""
+    return DEFAULT_RW_RESULT
+
+
+class _StubRemnawave:
+    """Ручная заглушка RemnawaveService для тестов.
+
+    AsyncMock(spec=RemnawaveService) при создании обходит весь класс
+    интроспекцией; тестам нужны лишь три метода — отдельные AsyncMock
+    без spec на порядок дешевле и так же отслеживают вызовы.
+    """
+
+    def __init__(self) -> None:
+        self.create_user = AsyncMock()
+        self.update_expire_at = AsyncMock()
+        self.delete_user = AsyncMock()
+
+
+@pytest.fixture
+def stub_remnawave():
+    """Фабрика заглушек RemnaWave (_StubRemnawave)."""
+    return _StubRemnawave
+
+
+@pytest.fixture
+def make_service():
+    """Фабрика ClientService с замоканными зависимостями."""
+
+    def _build(
+        client_repo_mock: MagicMock | None = None,
+        operation_repo_mock: MagicMock | None = None,
+        remnawave_mock: MagicMock | None = None,
+    ) -> ClientService:
+        # Сессию сервис не await'ит напрямую (ей владеют репозитории),
+        # поэтому достаточно лёгкого MagicMock вместо AsyncMock.
+        session_mock = MagicMock()
+        # По умолчанию RemnaWave — лёгкая заглушка: большинство тестов
+        # падает на проверках ДО первого вызова RemnaWave. Тесты,
+        # доходящие до вызовов, передают _StubRemnawave() явно.
+        remnawave = (
+            remnawave_mock if remnawave_mock is not None else MagicMock()
+        )
+
+        service = ClientService(
+            session=session_mock,
+            remnawave=remnawave,
+            audit_session_factory=MagicMock(),
+        )
+
+        # Подменяем репозитории моками. Каждому репозиторию — свой
+        # AsyncMock: copy.copy прототипа делит _mock_children и списки
+        # вызовов между копиями, что смешивает стабы и счётчики.
+        service._client_repo = client_repo_mock or AsyncMock()
+        service._operation_repo = operation_repo_mock or AsyncMock()
+
+        return service
+
+    return _build
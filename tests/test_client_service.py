@@ -1,15 +1,11 @@
 """Unit-тесты бизнес-логики ClientService."""
 
-import uuid
-from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
-
 import pytest
 
-from app.models.client import Client, ClientStatus
+from conftest import TD, next_uuid
+
+from app.models.client import ClientStatus
 from app.models.operation import ActionType, OperationResult
-from app.services.client import ClientService
-from app.services.remnawave import RemnawaveService, RemnawaveUserResult
 from app.exceptions.handlers import (
     ClientAlreadyBlockedError,
     ClientAlreadyExistsError,
@@ -19,89 +15,50 @@ from app.exceptions.handlers import (
 
 
 # ── Фикстуры ────────────────────────────────────────────
-
-
-def _make_client(
-    status: ClientStatus = ClientStatus.ACTIVE,
-    days_until_expire: int = 30,
-) -> Client:
-    """Вспомогательная функция — создать тестового клиента."""
-    client = Client(
-        id=uuid.uuid4(),
-        username="test_user",
-        remnawave_uuid="rw-uuid-123",
-        short_uuid="short-abc",
-        subscription_url="https://vpn.example.com/sub/test_user",
-        status=status,
-        expires_at=datetime.now(tz=timezone.utc) + timedelta(days=days_until_expire),
-    )
-    return client
-
-
-def _make_rw_result() -> RemnawaveUserResult:
-    """Вспомогательная функция — создать результат RemnaWave."""
-    return RemnawaveUserResult(
-        uuid="rw-uuid-123",
-        username="test_user",
-        short_uuid="short-abc",
-        subscription_url="https://vpn.example.com/sub/test_user",
-        status="active",
-    )
-
-
-def _make_service(
-    client_repo_mock: MagicMock | None = None,
-    operation_repo_mock: MagicMock | None = None,
-    remnawave_mock: MagicMock | None = None,
-) -> ClientService:
-    """Создать ClientService с замоканными зависимостями."""
-    session_mock = AsyncMock()
-    audit_session_mock = AsyncMock()
-    remnawave = remnawave_mock or AsyncMock(spec=RemnawaveService)
-
-    service = ClientService(
-        session=session_mock,
-        audit_session=audit_session_mock,
-        remnawave=remnawave,
-    )
-
-    # Подменяем репозитории моками
-    if client_repo_mock:
-        service._client_repo = client_repo_mock
-    else:
-        service._client_repo = AsyncMock()
-
-    if operation_repo_mock:
-        service._operation_repo = operation_repo_mock
-    else:
-        service._operation_repo = AsyncMock()
-
-    service._audit_repo = AsyncMock()
-
-    return service
+# Фабрики make_service / stub_remnawave / make_client / rw_result
+# живут в conftest.py
 
 
 # ── Тесты: продление подписки ────────────────────────────
 
 
-@pytest.mark.asyncio
-async def test_extend_subscription_adds_days_to_future_expiry() -> None:
-    """Продление активной подписки: дни прибавляются к текущей дате истечения."""
-    client = _make_client(days_until_expire=15)
+@pytest.mark.parametrize(
+    "days_until_expire, extend_days, expect_from_now",
+    [
+        (15, 10, False),  # активная подписка: +10 дней к текущей дате
+        (-5, 30, True),  # просроченная: отсчёт от «сейчас»
+    ],
+    ids=["active_adds_days", "expired_starts_from_now"],
+)
+async def test_extend_subscription(
+    days_until_expire,
+    extend_days,
+    expect_from_now,
+    make_service,
+    stub_remnawave,
+    make_client,
+    rw_result,
+    frozen_now,
+) -> None:
+    """Продление подписки: от даты истечения или от текущего момента."""
+    client = make_client(days_until_expire=days_until_expire)
     original_expires = client.expires_at
 
-    remnawave_mock = AsyncMock(spec=RemnawaveService)
-    remnawave_mock.update_expire_at = AsyncMock(return_value=_make_rw_result())
+    remnawave_mock = stub_remnawave()
+    # Методы заглушки — AsyncMock, достаточно задать return_value
+    remnawave_mock.update_expire_at.return_value = rw_result
 
-    service = _make_service(remnawave_mock=remnawave_mock)
-    service._client_repo.get_by_id = AsyncMock(return_value=client)
-    service._client_repo.update = AsyncMock(return_value=client)
+    service = make_service(remnawave_mock=remnawave_mock)
+    service._client_repo.get_by_id.return_value = client
+    service._client_repo.update.return_value = client
 
-    result = await service.extend_subscription(client_id=client.id, days=10)
+    result = await service.extend_subscription(
+        client_id=client.id, days=extend_days
+    )
 
-    # Проверяем: новая дата = старая + 10 дней
-    expected = original_expires + timedelta(days=10)
-    assert abs((result.expires_at - expected).total_seconds()) < 5
+    # Часы заморожены — даты сравниваются точно (==)
+    base = frozen_now if expect_from_now else original_expires
+    assert result.expires_at == base + TD[extend_days]
 
     # Проверяем: аудит записан
     service._operation_repo.create.assert_called_once()
@@ -110,75 +67,89 @@ async def test_extend_subscription_adds_days_to_future_expiry() -> None:
     assert call_kwargs["result"] == OperationResult.SUCCESS
 
 
-@pytest.mark.asyncio
-async def test_extend_subscription_starts_from_now_if_expired() -> None:
-    """Продление просроченной подписки: отсчёт от текущего момента."""
-    client = _make_client(days_until_expire=-5)  # Просрочено на 5 дней
-
-    remnawave_mock = AsyncMock(spec=RemnawaveService)
-    remnawave_mock.update_expire_at = AsyncMock(return_value=_make_rw_result())
-
-    service = _make_service(remnawave_mock=remnawave_mock)
-    service._client_repo.get_by_id = AsyncMock(return_value=client)
-    service._client_repo.update = AsyncMock(return_value=client)
-
-    now_before = datetime.now(tz=timezone.utc)
-    result = await service.extend_subscription(client_id=client.id, days=30)
-    now_after = datetime.now(tz=timezone.utc)
-
-    # Новая дата должна быть ~now + 30 дней (не от старой даты)
-    expected_min = now_before + timedelta(days=30)
-    expected_max = now_after + timedelta(days=30)
-    assert expected_min <= result.expires_at <= expected_max
-
-
-# ── Тесты: блокировка ───────────────────────────────────
-
-
-@pytest.mark.asyncio
-async def test_block_already_blocked_raises_error() -> None:
-    """Блокировка уже заблокированного клиента → ошибка 409."""
-    client = _make_client(status=ClientStatus.BLOCKED)
-
-    service = _make_service()
-    service._client_repo.get_by_id = AsyncMock(return_value=client)
-
-    with pytest.raises(ClientAlreadyBlockedError):
-        await service.block_client(client_id=client.id)
-
-
-@pytest.mark.asyncio
-async def test_unblock_active_client_raises_error() -> None:
-    """Разблокировка активного клиента → ошибка 409."""
-    client = _make_client(status=ClientStatus.ACTIVE)
-
-    service = _make_service()
-    service._client_repo.get_by_id = AsyncMock(return_value=client)
-
-    with pytest.raises(ClientNotBlockedError):
-        await service.unblock_client(client_id=client.id)
-
-
-# ── Тесты: создание ─────────────────────────────────────
-
-
-@pytest.mark.asyncio
-async def test_create_duplicate_username_raises_error() -> None:
-    """Создание клиента с существующим username → ошибка 409."""
-    existing_client = _make_client()
-
-    service = _make_service()
-    service._client_repo.get_by_username = AsyncMock(return_value=existing_client)
-
-    with pytest.raises(ClientAlreadyExistsError):
-        await service.create_client(username="test_user", days=30)
-
-
-@pytest.mark.asyncio
-async def test_get_nonexistent_client_raises_error() -> None:
-    """Получение несуществующего клиента → ошибка 404."""
-    service = _make_service()
-    service._client_repo.get_by_id = AsyncMock(return_value=None)
-
-    with pytest.raises(ClientNotFoundError):
-        await service.get_client(client_id=uuid.uuid4())
+# ── Тесты: сценарии ошибок ──────────────────────────────
+
+
+class TestErrorPaths:
+    """Ошибочные сценарии: одинаковая подготовка, разные ожидания.
+
+    Четыре теста отличаются только методом репозитория, его ответом
+    и ожидаемым исключением — параметризация делит одну подготовку
+    моков на все случаи.
+    """
+
+    @pytest.mark.parametrize(
+        "repo_method, repo_return_factory, call, expected_exc",
+        [
+            (
+                "get_by_id",
+                lambda make_client: make_client(status=ClientStatus.BLOCKED),
+                lambda service: service.block_client(client_id=next_uuid()),
+                ClientAlreadyBlockedError,
+            ),
+            (
+                "get_by_id",
+                lambda make_client: make_client(status=ClientStatus.ACTIVE),
+                lambda service: service.unblock_client(client_id=next_uuid()),
+                ClientNotBlockedError,
+            ),
+            (
+                # Типовой дубликат: предварительный SELECT нашёл клиента
+                "get_by_username",
+                lambda make_client: make_client(),
+                lambda service: service.create_client(
+                    username="test_user", days=30
+                ),
+                ClientAlreadyExistsError,
+            ),
+            (
+                # Гонка: SELECT пуст, но ON CONFLICT DO NOTHING
+                # не вернул строку — username занят конкурентом
+                "insert_if_absent",
+                lambda make_client: None,
+                lambda service: service.create_client(
+                    username="test_user", days=30
+                ),
+                ClientAlreadyExistsError,
+            ),
+            (
+                "get_by_id",
+                lambda make_client: None,
+                lambda service: service.get_client(client_id=next_uuid()),
+                ClientNotFoundError,
+            ),
+        ],
+        ids=[
+            "block_already_blocked",
+            "unblock_active",
+            "create_duplicate_username",
+            "create_duplicate_race",
+            "get_nonexistent",
+        ],
+    )
+    async def test_raises_expected_error(
+        self,
+        repo_method,
+        repo_return_factory,
+        call,
+        expected_exc,
+        make_service,
+        stub_remnawave,
+        make_client,
+    ) -> None:
+        """Каждый ошибочный сценарий поднимает своё исключение."""
+        # Сценарий гонки доходит до вызовов RemnaWave (create_user,
+        # компенсационный delete_user) — ему нужен async-мок, а
+        # предварительный SELECT должен вернуть «свободно».
+        if repo_method == "insert_if_absent":
+            service = make_service(remnawave_mock=stub_remnawave())
+            service._client_repo.get_by_username.return_value = None
+        else:
+            service = make_service()
+        # Дочерний мок уже AsyncMock — задаём только return_value
+        getattr(service._client_repo, repo_method).return_value = (
+            repo_return_factory(make_client)
+        )
+
+        with pytest.raises(expected_exc):
+            await call(service)
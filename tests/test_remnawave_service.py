@@ -0,0 +1,52 @@
+"""Unit-тесты повторов RemnawaveService при 429 от панели."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from remnawave.exceptions import (
+    ApiErrorResponse,
+    NotFoundError,
+    RateLimitError,
+)
+
+from app.services.remnawave import RemnawaveService
+
+
+def _rate_limited() -> RateLimitError:
+    """Собрать RateLimitError в том виде, в каком его бросает SDK."""
+    return RateLimitError(429, ApiErrorResponse(message="Too many requests"))
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> RemnawaveService:
+    """RemnawaveService поверх мок-SDK с моментальным asyncio.sleep."""
+    monkeypatch.setattr("app.services.remnawave.asyncio.sleep", AsyncMock())
+    return RemnawaveService(sdk=MagicMock())
+
+
+async def test_call_retries_rate_limit_then_succeeds(service) -> None:
+    """429 повторяется, успешный ответ возвращается как есть."""
+    sdk_call = AsyncMock(side_effect=[_rate_limited(), _rate_limited(), "ok"])
+
+    assert await service._call(sdk_call) == "ok"
+    assert sdk_call.call_count == 3
+
+
+async def test_call_gives_up_after_max_retries(service) -> None:
+    """После _MAX_RETRIES попыток 429 пробрасывается наружу."""
+    sdk_call = AsyncMock(side_effect=_rate_limited())
+
+    with pytest.raises(RateLimitError):
+        await service._call(sdk_call)
+    assert sdk_call.call_count == RemnawaveService._MAX_RETRIES
+
+
+async def test_call_reraises_other_api_errors_immediately(service) -> None:
+    """Не-429 ошибка панели не повторяется."""
+    sdk_call = AsyncMock(
+        side_effect=NotFoundError(404, ApiErrorResponse(message="Not found"))
+    )
+
+    with pytest.raises(NotFoundError):
+        await service._call(sdk_call)
+    assert sdk_call.call_count == 1